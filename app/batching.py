@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class BatchedTranscriber:
+    """Micro-batches concurrent transcription requests.
+
+    Concurrent /recommend/audio requests are queued and dispatched together
+    (up to max_batch items or after max_wait_ms) in a single worker call,
+    so the model is driven by one thread instead of one thread per request.
+    Results are fanned back to callers via per-item futures.
+    """
+
+    def __init__(self, speech_processor, max_batch: int = 8, max_wait_ms: int = 50):
+        self.speech_processor = speech_processor
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+
+    async def submit(self, audio_file_path: str) -> Optional[str]:
+        """Submit an audio file for transcription and await its result."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio_file_path, future))
+        return await future
+
+    def _ensure_worker(self):
+        """Start the background batching task on first use."""
+        if self._worker_task is None or self._worker_task.done():
+            self._queue = asyncio.Queue()
+            self._worker_task = asyncio.create_task(self._worker_loop())
+
+    async def _worker_loop(self):
+        """Collect pending requests into batches and dispatch them."""
+        while True:
+            try:
+                batch = await self._collect_batch()
+                paths = [path for path, _ in batch]
+                try:
+                    results = await asyncio.to_thread(
+                        self.speech_processor.transcribe_batch, paths
+                    )
+                except Exception as e:
+                    logger.error(f"Batched transcription failed: {e}")
+                    results = [None] * len(batch)
+
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in transcription batch worker: {e}")
+
+    async def _collect_batch(self):
+        """Wait for the first item, then gather more until the batch window closes."""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
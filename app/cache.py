@@ -0,0 +1,41 @@
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Simple thread-safe LRU cache for computed recommendation responses.
+
+    Keyed by a content digest (e.g. SHA-256 of the uploaded audio or the
+    request text), so identical inputs skip transcription, intent
+    extraction and ranking entirely.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries (e.g. after the dataset changes)."""
+        with self._lock:
+            self._entries.clear()
@@ -1,14 +1,20 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
+import asyncio
+import hashlib
 import tempfile
 import os
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
 import uvicorn
 
-from speech_to_text import SpeechToTextProcessor
+from speech_to_text import SpeechToTextProcessor, get_processor
+from batching import BatchedTranscriber
+from cache import ResponseCache
 from nlp_intent import IntentExtractor
 from recommender import ActivityRecommender
 
@@ -16,11 +22,45 @@ from recommender import ActivityRecommender
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Components, initialized once per process in the lifespan handler
+speech_processor: Optional[SpeechToTextProcessor] = None
+batched_transcriber: Optional[BatchedTranscriber] = None
+intent_extractor: Optional[IntentExtractor] = None
+recommender: Optional[ActivityRecommender] = None
+response_cache = ResponseCache(maxsize=512)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load models once at startup instead of at module import.
+
+    Keeps imports cheap (reload tooling, scripts importing main) and gives
+    process managers like gunicorn --preload a single load point whose
+    read-only weights can be copy-on-write shared across workers.
+    """
+    global speech_processor, batched_transcriber, intent_extractor, recommender
+
+    # Size the pool backing asyncio.to_thread for the model calls below
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+    )
+
+    logger.info("Initializing components...")
+    speech_processor = get_processor()
+    await asyncio.to_thread(speech_processor.warm_up)
+    batched_transcriber = BatchedTranscriber(speech_processor, max_batch=8, max_wait_ms=50)
+    intent_extractor = IntentExtractor()
+    recommender = ActivityRecommender()
+    logger.info("Components initialized")
+
+    yield
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Voice Activity Recommendation System",
     description="AI-powered system that converts speech to personalized activity recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -32,20 +72,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize components
-speech_processor = SpeechToTextProcessor(use_whisper=True)
-intent_extractor = IntentExtractor()
-recommender = ActivityRecommender()
+# Upload chunk size for streaming audio files to disk
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
 
 # Pydantic models
 class TextRequest(BaseModel):
     text: str
 
-class RecommendationResponse(BaseModel):
-    recommendations: List[Dict[str, Any]]
-    intent_summary: str
-    processing_info: Dict[str, Any]
-
 class ActivityRequest(BaseModel):
     activity: str
     category: str
@@ -81,18 +114,28 @@ async def health_check():
         }
     }
 
-@app.post("/recommend/text", response_model=RecommendationResponse)
+@app.post("/recommend/text")
 async def recommend_from_text(request: TextRequest):
     """Get activity recommendations from text input."""
     try:
         logger.info(f"Processing text: {request.text}")
 
-        # Extract intent from text
-        intent = intent_extractor.extract_intent(request.text)
+        # Return cached response for previously seen text
+        cache_key = f"text:{hashlib.sha256(request.text.encode()).hexdigest()}"
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached text recommendation")
+            return cached
+
+        # Extract intent from text off the event loop; these are CPU-bound
+        # model calls that would otherwise block concurrent requests
+        intent = await asyncio.to_thread(intent_extractor.extract_intent, request.text)
         intent_summary = intent_extractor.get_intent_summary(intent)
 
         # Get recommendations
-        recommendations = recommender.recommend_activities(intent, top_k=5)
+        recommendations = await asyncio.to_thread(
+            recommender.recommend_activities, intent, top_k=5
+        )
 
         processing_info = {
             "input_type": "text",
@@ -100,17 +143,21 @@ async def recommend_from_text(request: TextRequest):
             "recommendations_count": len(recommendations)
         }
 
-        return RecommendationResponse(
-            recommendations=recommendations,
-            intent_summary=intent_summary,
-            processing_info=processing_info
-        )
+        # Plain dict: orjson serializes it directly, skipping the Pydantic
+        # validation/encoding pass
+        response = {
+            "recommendations": recommendations,
+            "intent_summary": intent_summary,
+            "processing_info": processing_info
+        }
+        response_cache.set(cache_key, response)
+        return response
 
     except Exception as e:
         logger.error(f"Error processing text recommendation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/recommend/audio", response_model=RecommendationResponse)
+@app.post("/recommend/audio")
 async def recommend_from_audio(audio_file: UploadFile = File(...)):
     """Get activity recommendations from audio file."""
     try:
@@ -124,15 +171,25 @@ async def recommend_from_audio(audio_file: UploadFile = File(...)):
                 detail=f"Unsupported audio format. Allowed: {allowed_types}"
             )
 
-        # Save uploaded file temporarily
+        # Stream the upload to disk in chunks so peak memory stays bounded
+        # regardless of file size, hashing it along the way for the cache key
+        digest = hashlib.sha256()
         with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
+            while chunk := await audio_file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                temp_file.write(chunk)
             temp_file_path = temp_file.name
 
         try:
-            # Transcribe audio to text
-            transcribed_text = speech_processor.transcribe_audio(temp_file_path)
+            # Return cached response for previously seen audio
+            cache_key = f"audio:{digest.hexdigest()}:{speech_processor.model_size}"
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Returning cached audio recommendation")
+                return cached
+
+            # Transcribe audio to text (batched across concurrent requests)
+            transcribed_text = await batched_transcriber.submit(temp_file_path)
 
             if not transcribed_text:
                 raise HTTPException(
@@ -142,12 +199,14 @@ async def recommend_from_audio(audio_file: UploadFile = File(...)):
 
             logger.info(f"Transcribed text: {transcribed_text}")
 
-            # Extract intent from transcribed text
-            intent = intent_extractor.extract_intent(transcribed_text)
+            # Extract intent from transcribed text, off the event loop
+            intent = await asyncio.to_thread(intent_extractor.extract_intent, transcribed_text)
             intent_summary = intent_extractor.get_intent_summary(intent)
 
             # Get recommendations
-            recommendations = recommender.recommend_activities(intent, top_k=5)
+            recommendations = await asyncio.to_thread(
+                recommender.recommend_activities, intent, top_k=5
+            )
 
             processing_info = {
                 "input_type": "audio",
@@ -156,11 +215,13 @@ async def recommend_from_audio(audio_file: UploadFile = File(...)):
                 "recommendations_count": len(recommendations)
             }
 
-            return RecommendationResponse(
-                recommendations=recommendations,
-                intent_summary=intent_summary,
-                processing_info=processing_info
-            )
+            response = {
+                "recommendations": recommendations,
+                "intent_summary": intent_summary,
+                "processing_info": processing_info
+            }
+            response_cache.set(cache_key, response)
+            return response
 
         finally:
             # Clean up temporary file
@@ -183,7 +244,7 @@ async def get_stats():
             "dataset_stats": stats,
             "system_info": {
                 "speech_processor": "Whisper + SpeechRecognition",
-                "intent_extractor": "DistilRoBERTa + TextBlob",
+                "intent_extractor": "DistilRoBERTa + VADER",
                 "recommender": "Content-based filtering with TF-IDF"
             }
         }
@@ -223,6 +284,8 @@ async def add_activity(request: ActivityRequest):
         success = recommender.add_activity(activity_data)
 
         if success:
+            # Cached responses may no longer reflect the dataset
+            response_cache.clear()
             return {"message": "Activity added successfully", "activity": activity_data}
         else:
             raise HTTPException(status_code=500, detail="Failed to add activity")
@@ -243,10 +306,11 @@ async def general_exception_handler(request, exc):
     )
 
 if __name__ == "__main__":
+    # No reload: auto-reload restarts the process (and reloads all models)
+    # on every file touch
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
         log_level="info"
     )
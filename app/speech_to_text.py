@@ -1,31 +1,88 @@
-import whisper
+import functools
+import io
 import speech_recognition as sr
 import tempfile
 import os
 import logging
 from typing import Optional
+import ctranslate2
+import numpy as np
 import librosa
 import soundfile as sf
+from scipy.signal import resample_poly
+from faster_whisper import WhisperModel
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1)
+def get_processor() -> "SpeechToTextProcessor":
+    """Process-wide SpeechToTextProcessor singleton.
+
+    Guarantees the Whisper model is loaded at most once per process, no
+    matter how many call sites construct a processor.
+    """
+    return SpeechToTextProcessor(use_whisper=True)
+
 class SpeechToTextProcessor:
-    def __init__(self, use_whisper: bool = True):
+    def __init__(self, use_whisper: bool = True, model_size: str = "small.en",
+                 download_root: str = "models/whisper"):
         """Initialize the speech-to-text processor."""
         self.use_whisper = use_whisper
-        self.whisper_model = None
+        self.model_size = model_size
+        self.download_root = download_root
+        self._whisper_model = None
         self.sr_recognizer = sr.Recognizer()
-
-        if use_whisper:
+        # Dispatch is decided once here instead of re-branching on every
+        # call; the Whisper path already falls back to SR on failure
+        self._transcribe_impl = (
+            self._transcribe_with_whisper if use_whisper else self._transcribe_with_sr
+        )
+
+    @property
+    def whisper_model(self) -> Optional[WhisperModel]:
+        """Lazily load the Whisper model on first use.
+
+        Loading is deferred so that constructing the processor (and hitting
+        endpoints like /health) doesn't block on model initialization.
+        """
+        if self._whisper_model is None and self.use_whisper:
             try:
-                logger.info("Loading Whisper model...")
-                self.whisper_model = whisper.load_model("base")
+                logger.info(f"Loading faster-whisper model '{self.model_size}'...")
+                use_gpu = ctranslate2.get_cuda_device_count() > 0
+                # download_root keeps the converted CTranslate2 artifacts in a
+                # project-local dir (mounted as a volume in docker-compose),
+                # so restarts load from disk instead of re-downloading
+                self._whisper_model = WhisperModel(
+                    self.model_size,
+                    device="cuda" if use_gpu else "cpu",
+                    compute_type="int8_float16" if use_gpu else "int8",
+                    download_root=self.download_root
+                )
                 logger.info("Whisper model loaded successfully")
             except Exception as e:
                 logger.error(f"Failed to load Whisper model: {e}")
                 self.use_whisper = False
 
+        return self._whisper_model
+
+    def warm_up(self):
+        """Run a short silent clip through the model at startup.
+
+        Pays the one-time model load and kernel initialization cost up
+        front so the first real request doesn't absorb it.
+        """
+        try:
+            if self.use_whisper and self.whisper_model:
+                segments, _ = self.whisper_model.transcribe(
+                    np.zeros(16000, dtype=np.float32), beam_size=1
+                )
+                for _ in segments:
+                    pass
+                logger.info("Whisper model warmed up")
+        except Exception as e:
+            logger.warning(f"Whisper warm-up failed: {e}")
+
     def transcribe_audio(self, audio_file_path: str) -> Optional[str]:
         """
         Transcribe audio file to text.
@@ -37,56 +94,101 @@ class SpeechToTextProcessor:
             Transcribed text or None if failed
         """
         try:
-            # Ensure audio file exists
-            if not os.path.exists(audio_file_path):
-                logger.error(f"Audio file not found: {audio_file_path}")
-                return None
-
-            # Try Whisper first
-            if self.use_whisper and self.whisper_model:
-                return self._transcribe_with_whisper(audio_file_path)
+            # Decode once; the same buffer serves the Whisper pass and any
+            # SR fallback instead of decoding the file twice. A missing file
+            # raises here and lands in the except below.
+            audio_data = self._load_audio_16k(audio_file_path)
 
-            # Fallback to SpeechRecognition
-            return self._transcribe_with_sr(audio_file_path)
+            return self._transcribe_impl(audio_data)
 
         except Exception as e:
             logger.error(f"Error transcribing audio: {e}")
             return None
 
-    def _transcribe_with_whisper(self, audio_file_path: str) -> Optional[str]:
-        """Transcribe using OpenAI Whisper."""
+    def _transcribe_with_whisper(self, audio) -> Optional[str]:
+        """Transcribe using faster-whisper (CTranslate2 backend).
+
+        Accepts a file path or a 16 kHz mono float32 numpy array.
+        """
         try:
-            logger.info("Transcribing with Whisper...")
-            result = self.whisper_model.transcribe(audio_file_path)
-            text = result["text"].strip()
+            logger.info("Transcribing with faster-whisper...")
+            # VAD strips silent head/tail and long pauses before the encoder,
+            # so model time scales with speech, not file length
+            # language="en" skips the language-detection pass and
+            # without_timestamps skips timestamp-token sampling in the decoder
+            segments, _ = self.whisper_model.transcribe(
+                audio,
+                beam_size=1,
+                language="en",
+                without_timestamps=True,
+                vad_filter=True,
+                vad_parameters=dict(min_silence_duration_ms=500)
+            )
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+
+            if not text:
+                logger.info("No speech detected in audio")
+                return None
+
             logger.info(f"Whisper transcription: {text}")
             return text
         except Exception as e:
             logger.error(f"Whisper transcription failed: {e}")
-            return self._transcribe_with_sr(audio_file_path)
+            return self._transcribe_with_sr(audio)
 
-    def _transcribe_with_sr(self, audio_file_path: str) -> Optional[str]:
-        """Transcribe using SpeechRecognition library."""
+    def transcribe_batch(self, audio_file_paths: list) -> list:
+        """
+        Transcribe a batch of audio files in one call.
+
+        Args:
+            audio_file_paths: Paths to the audio files
+
+        Returns:
+            List of transcribed texts (None entries for failures), in input order
+        """
+        return [self.transcribe_audio(path) for path in audio_file_paths]
+
+    def _load_audio_16k(self, audio_file_path: str) -> np.ndarray:
+        """Decode an audio file to 16 kHz mono float32.
+
+        soundfile's libsndfile backend decodes wav/flac/ogg in C, far faster
+        than librosa's audioread path; librosa remains the fallback for
+        formats libsndfile can't read (e.g. mp3).
+        """
         try:
-            logger.info("Transcribing with SpeechRecognition...")
+            data, sample_rate = sf.read(audio_file_path, dtype='float32', always_2d=False)
+            if data.ndim > 1:
+                data = data.mean(axis=1)
+            if sample_rate != 16000:
+                data = resample_poly(data, 16000, sample_rate).astype(np.float32)
+            return data
+        except Exception as e:
+            logger.warning(f"soundfile decode failed ({e}), falling back to librosa")
+            data, _ = librosa.load(audio_file_path, sr=16000)
+            return data
 
-            # Convert audio to WAV format if needed
-            audio_data, sr_rate = librosa.load(audio_file_path, sr=16000)
+    def _transcribe_with_sr(self, audio) -> Optional[str]:
+        """Transcribe using SpeechRecognition library.
 
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                sf.write(tmp_file.name, audio_data, sr_rate)
+        Accepts a file path or a 16 kHz mono float32 numpy array.
+        """
+        try:
+            logger.info("Transcribing with SpeechRecognition...")
 
-                with sr.AudioFile(tmp_file.name) as source:
-                    audio = self.sr_recognizer.record(source)
+            # Decode and resample to 16 kHz mono, unless already decoded
+            audio_data = audio if isinstance(audio, np.ndarray) else self._load_audio_16k(audio)
+            sr_rate = 16000
 
-                # Try Google Speech Recognition
-                text = self.sr_recognizer.recognize_google(audio)
-                logger.info(f"SpeechRecognition transcription: {text}")
+            # Hand PCM bytes to the recognizer directly instead of writing a
+            # temp WAV and re-reading it through sr.AudioFile
+            pcm16 = (audio_data * 32767).astype(np.int16).tobytes()
+            audio = sr.AudioData(pcm16, sr_rate, 2)
 
-                # Clean up temp file
-                os.unlink(tmp_file.name)
+            # Try Google Speech Recognition
+            text = self.sr_recognizer.recognize_google(audio)
+            logger.info(f"SpeechRecognition transcription: {text}")
 
-                return text
+            return text
 
         except sr.UnknownValueError:
             logger.error("Speech Recognition could not understand audio")
@@ -110,6 +212,21 @@ class SpeechToTextProcessor:
             Transcribed text or None if failed
         """
         try:
+            # Formats libsndfile can decode are transcribed straight from
+            # memory, skipping the temp-file round trip
+            if format in ("wav", "flac", "ogg") and self.use_whisper and self.whisper_model:
+                try:
+                    data, sample_rate = sf.read(
+                        io.BytesIO(audio_bytes), dtype='float32', always_2d=False
+                    )
+                    if data.ndim > 1:
+                        data = data.mean(axis=1)
+                    if sample_rate != 16000:
+                        data = resample_poly(data, 16000, sample_rate).astype(np.float32)
+                    return self._transcribe_with_whisper(data)
+                except Exception as e:
+                    logger.warning(f"In-memory transcription failed ({e}), using temp file")
+
             # Save bytes to temporary file
             with tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False) as tmp_file:
                 tmp_file.write(audio_bytes)
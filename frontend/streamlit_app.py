@@ -1,6 +1,6 @@
 import streamlit as st
 import requests
-import json
+import orjson
 import io
 import time
 from datetime import datetime
@@ -71,22 +71,29 @@ class ActivityRecommenderUI:
     def __init__(self):
         self.api_base_url = API_BASE_URL
 
+        # Keep-alive session: reruns reuse pooled TCP connections instead of
+        # paying a new handshake per API call
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def check_api_health(self) -> bool:
         try:
-            response = requests.get(f"{self.api_base_url}/health", timeout=5)
+            response = self.session.get(f"{self.api_base_url}/health", timeout=5)
             return response.status_code == 200
         except:
             return False
 
     def get_text_recommendations(self, text: str) -> Dict[str, Any]:
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_base_url}/recommend/text",
                 json={"text": text},
                 timeout=30
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             st.error(f"Error getting recommendations: {str(e)}")
             return None
@@ -94,36 +101,60 @@ class ActivityRecommenderUI:
     def get_audio_recommendations(self, audio_bytes: bytes, filename: str) -> Dict[str, Any]:
         try:
             files = {"audio_file": (filename, audio_bytes, "audio/wav")}
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_base_url}/recommend/audio",
                 files=files,
                 timeout=60
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             st.error(f"Error processing audio: {str(e)}")
             return None
 
     def get_stats(self) -> Dict[str, Any]:
         try:
-            response = requests.get(f"{self.api_base_url}/stats", timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return _fetch_json(f"{self.api_base_url}/stats")
         except Exception as e:
             st.error(f"Error getting stats: {str(e)}")
             return None
 
     def get_all_activities(self) -> Dict[str, Any]:
         try:
-            response = requests.get(f"{self.api_base_url}/activities", timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return _fetch_json(f"{self.api_base_url}/activities")
         except Exception as e:
             st.error(f"Error getting activities: {str(e)}")
             return None
 
 
+@st.cache_data
+def _activities_frame(activities: List[Dict[str, Any]]) -> pd.DataFrame:
+    """DataFrame view of the activities payload, cached across reruns."""
+    return pd.DataFrame(activities)
+
+
+@st.cache_data
+def _unique_fields(activities: List[Dict[str, Any]]) -> tuple:
+    """Sorted category and mood option lists, cached across reruns."""
+    categories = sorted({activity["category"] for activity in activities})
+    moods = sorted({activity["mood"] for activity in activities})
+    return categories, moods
+
+
+@st.cache_resource
+def get_ui() -> ActivityRecommenderUI:
+    """Share one UI instance (and its HTTP session) across reruns."""
+    return ActivityRecommenderUI()
+
+
+@st.cache_data(ttl=60)
+def _fetch_json(url: str) -> Dict[str, Any]:
+    """GET near-static API data, memoized for 60 seconds across reruns."""
+    response = get_ui().session.get(url, timeout=10)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
 def render_recommendation_card(rec: Dict[str, Any], index: int):
     with st.container():
         col1, col2, col3 = st.columns([3, 1, 1])
@@ -227,7 +258,7 @@ def render_stats_dashboard(stats_data: Dict[str, Any]):
 
 
 def main():
-    ui = ActivityRecommenderUI()
+    ui = get_ui()
 
     st.title("🎙️ Voice Activity Recommendation System")
     st.markdown("*AI-powered personalized activity suggestions from your voice or text input*")
@@ -260,7 +291,7 @@ def main():
         st.code('"I want to exercise for 30 minutes"')
         st.code('"Something creative for this evening"')
 
-    if not ui.check_api_health():
+    if not api_healthy:
         st.error("🚫 Cannot connect to the API backend. Please start the FastAPI server first.")
         st.code("cd app && python main.py")
         return
@@ -393,27 +424,23 @@ def main():
             if activities:
                 col1, col2, col3 = st.columns(3)
 
+                categories, moods = _unique_fields(activities)
                 with col1:
-                    categories = list(set(activity["category"] for activity in activities))
                     selected_category = st.selectbox("Filter by Category", ["All"] + categories)
                 with col2:
-                    moods = list(set(activity["mood"] for activity in activities))
                     selected_mood = st.selectbox("Filter by Mood", ["All"] + moods)
                 with col3:
                     max_time = st.slider("Maximum Time (minutes)", 0, 180, 180)
 
-                filtered_activities = activities
+                # Vectorized mask filtering on the cached DataFrame instead of
+                # chained list comprehensions per widget interaction
+                df = _activities_frame(activities)
+                mask = df["time_minutes"] <= max_time
                 if selected_category != "All":
-                    filtered_activities = [
-                        a for a in filtered_activities if a["category"] == selected_category
-                    ]
+                    mask &= df["category"] == selected_category
                 if selected_mood != "All":
-                    filtered_activities = [
-                        a for a in filtered_activities if a["mood"] == selected_mood
-                    ]
-                filtered_activities = [
-                    a for a in filtered_activities if a["time_minutes"] <= max_time
-                ]
+                    mask &= df["mood"] == selected_mood
+                filtered_activities = df[mask].to_dict("records")
 
                 st.write(f"**Showing {len(filtered_activities)} activities**")
 
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import uvicorn
 import logging
@@ -8,7 +9,10 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Voice Activity Recommender - Debug Version")
+app = FastAPI(
+    title="Voice Activity Recommender - Debug Version",
+    default_response_class=ORJSONResponse
+)
 
 app.add_middleware(
     CORSMiddleware,